@@ -1,5 +1,6 @@
 """Application configuration using Pydantic settings."""
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 
@@ -22,6 +23,11 @@ class Settings(BaseSettings):
     SERVER_HOST: str = "127.0.0.1"
     SERVER_PORT: int = 8000
 
+    @property
+    def cors_origins_set(self) -> frozenset[str]:
+        """Deduplicated, immutable CORS origins."""
+        return frozenset(self.CORS_ORIGINS)
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -29,4 +35,7 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment and .env only once."""
+    return Settings()
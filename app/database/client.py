@@ -1,10 +1,7 @@
 from contextlib import asynccontextmanager
 
 from supabase import acreate_client, AsyncClient
-from app.config import settings
-
-key: str = settings.SUPABASE_KEY
-url: str = settings.SUPABASE_URL
+from app.config import get_settings
 
 # Global reference
 supabase_client: AsyncClient | None = None
@@ -12,7 +9,8 @@ supabase_client: AsyncClient | None = None
 async def init_supabase():
     """Initialize Supabase client on app startup"""
     global supabase_client
-    supabase_client = await acreate_client(url, key)
+    settings = get_settings()
+    supabase_client = await acreate_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 async def close_supabase():
     """Close Supabase client on app shutdown"""
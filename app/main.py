@@ -5,7 +5,7 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import settings
+from app.config import get_settings
 from app.routes import router
 
 
@@ -23,10 +23,12 @@ app = FastAPI(
 )
 app.include_router(router)
 
-# CORS middleware for React frontend
+# CORS middleware for React frontend. Middleware must be registered while the app is built,
+# so this is the one deliberate eager settings read: importing app.main loads settings once.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    # CORSMiddleware takes a Sequence[str]; the set only deduplicates the configured origins
+    allow_origins=sorted(get_settings().cors_origins_set),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -35,6 +37,7 @@ app.add_middleware(
 if __name__ == "__main__":
     import uvicorn
 
+    settings = get_settings()
     uvicorn.run(
         "app.main:app",
         host=settings.SERVER_HOST,
@@ -4,4 +4,10 @@ from app.handlers import health
 
 router = APIRouter()
 
-router.add_api_route(path="/health", endpoint=health.health_check, methods=["GET"])
+router.add_api_route(
+    path="/health",
+    endpoint=health.health_check,
+    methods=["GET"],
+    response_model=None,
+    include_in_schema=False,
+)
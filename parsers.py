@@ -0,0 +1,313 @@
+"""
+Pure text parsers for race chart pages.
+
+Kept free of PDF and file I/O so the module can be compiled ahead of time with
+mypyc (see `make compile-parsers`); extract_races.py imports the same names
+whether this module is compiled or not.
+"""
+
+# Standard library imports
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Constants
+VALID_SURFACES = ["Dirt", "Turf", "All Weather", "Tapeta"]
+CSV_FIELDNAMES = [
+    "Date", "Race #", "Surface", "Distance", "Jockey", "Trainer", "WIN", "PLACE", "SHOW",
+]
+
+
+class RaceRow(NamedTuple):
+    """One output row; field order must match CSV_FIELDNAMES (the CSV header)."""
+
+    date: str
+    race_num: str
+    surface: str | None
+    distance: str | None
+    jockey: str
+    trainer: str
+    win: int
+    place: int
+    show: int
+
+
+# (WIN, PLACE, SHOW) flags indexed by finish position; everyone after 3rd gets _NO_WPS
+_WPS = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+_NO_WPS = (0, 0, 0)
+
+# Compiled patterns (compiled once at import, reused for every page and line)
+# Track name is words separated by spaces/tabs only; a free-running [A-Z\s\.]+? next to \s*
+# backtracks catastrophically over the whitespace padding of layout text on headerless pages.
+_HEADER_RE = re.compile(
+    r'([A-Z\.]+(?:[ \t]+[A-Z\.]+)*)\s*-\s*(.*?)\s*-\s*Race\s*(\d+)', re.IGNORECASE
+)
+_DIST_RE = re.compile(r'Distance:\s*(.*?)\s*On\s*The\s*(.*)', re.IGNORECASE)
+# Any VALID_SURFACES name, tolerating compressed spaces ("AllWeather"); the leftmost hit wins
+_SURFACE_RE = re.compile(
+    '|'.join(r'\s*'.join(map(re.escape, vs.split())) for vs in VALID_SURFACES), re.IGNORECASE
+)
+_SURFACE_CANON = {vs.lower().replace(' ', ''): vs for vs in VALID_SURFACES}
+_CAMEL_RE = re.compile(r'(?<!^)(?=[A-Z])')
+_TRAINERS_RE = re.compile(r'Trainers:\s*(.*?)(?=\s*Owners:|$)', re.IGNORECASE | re.DOTALL)
+_SPLIT_RE = re.compile(r'[;]')
+_TRAINER_ENTRY_RE = re.compile(r'(\d+[A-Za-z]*)\s*-\s*(.*)')
+_LOWER_UPPER_RE = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_NAME_PREFIX_RE = re.compile(r'\b(De|Mc|Mac|O)\s+([A-Z])')
+_PERIOD_UPPER_RE = re.compile(r'\.(?=[A-Z])')
+# One horse row per line: skips wager lines ($..., Pick/Double/Exacta); the PGM is the first
+# token shaped like "1", "1A" or "10" (Last Raced tokens such as "3Dec22 4AQU5", "18Dec22" or
+# "---" are skipped, however many there are); the jockey is the first later Horse(Last,First)
+# token whose last balanced paren group (up to two nesting levels) contains a comma, i.e.
+# exactly what extract_jockey_and_horse accepts. Separators are [ \t] so a match never
+# crosses a line when run over a whole page with finditer.
+_HORSE_RE = re.compile(
+    r'^(?![ \t]*\$)(?!.*(?:Pick|Double|Exacta))[ \t]*'
+    r'(?:(?!\d+[A-Za-z]*[ \t])\S+[ \t]+)*?(\d+[A-Za-z]*)[ \t]+'
+    r'(?:\S+[ \t]+)*?'
+    r'(\S+?\((?=\S*,)(?:[^()\s]|\((?:[^()\s]|\([^()\s]*\))*\))*\))(?!\S)',
+    re.MULTILINE,
+)
+# Zero-width month/day boundary or a comma between digits; both are fixed in one pass
+_DATE_NORM = re.compile(r'(?<=[a-zA-Z])(?=\d)|(?<=\d),(?=\d)')
+
+
+# Parsing functions
+def parse_header(text: str) -> tuple[str, str, str] | tuple[None, None, None]:
+    """
+    Parses the header to extract Track, Date, and Race number.
+    Handles compressed spaces like "AQUEDUCT-January1,2025-Race1"
+
+    Returns:
+        tuple: (track, date_str, race_num) or (None, None, None) if not found
+    """
+    match = _HEADER_RE.search(text)
+    if match:
+        return match.group(1).strip(), match.group(2).strip(), match.group(3).strip()
+    return None, None, None
+
+
+def parse_distance_surface(text: str) -> tuple[str, str] | tuple[None, None]:
+    """
+    Parses the distance and surface from text.
+    Handles compressed spaces like "Distance:SixFurlongsOnTheDirt"
+
+    Returns:
+        tuple: (distance, surface) or (None, None) if not found
+    """
+    match = _DIST_RE.search(text)
+    if match:
+        distance = match.group(1).strip()
+        surface_raw = match.group(2).strip()
+
+        # Identify surface type
+        surface_match = _SURFACE_RE.search(surface_raw)
+        surface = "Unknown"
+        if surface_match:
+            surface = _SURFACE_CANON.get(''.join(surface_match.group(0).lower().split()), "Unknown")
+
+        # Clean up distance (add spaces between capitalized words)
+        if " " not in distance and len(distance) > 3:
+            distance = _CAMEL_RE.sub(' ', distance)
+
+        return distance, surface
+    return None, None
+
+
+def parse_trainers_footer(text: str) -> dict[str, str]:
+    """
+    Parses the Trainers footer section to extract trainer names by program number.
+    Stops parsing when "Owners:" is encountered.
+
+    Returns:
+        dict: Mapping of program number (str) to trainer name (str)
+    """
+    trainer_map: dict[str, str] = {}
+    # Capture text between "Trainers:" and "Owners:"
+    # Use non-greedy match .*? and lookahead for Owners: or end of string
+    match = _TRAINERS_RE.search(text)
+    if match:
+        content = match.group(1).replace('\n', ' ') # Handle multi-line entries
+        entries = _SPLIT_RE.split(content) # Split by semicolon
+        for entry in entries:
+            entry = entry.strip()
+            if not entry:
+                continue
+            # Look for "PGM - Name"
+            # Regex: Start with digits (and optional letters), then hyphen, then rest.
+            m = _TRAINER_ENTRY_RE.match(entry)
+            if m:
+                pgm = m.group(1)
+                trainer = m.group(2).strip()
+                if trainer.endswith('.'):
+                    trainer = trainer[:-1]
+
+                # Format name: Ensure space after comma if missing
+                if ',' in trainer and ', ' not in trainer:
+                    trainer = trainer.replace(',', ', ')
+
+                # Handle CamelCase in trainer name (e.g. BarreraIII -> Barrera III)
+                # Also "Bond, H.James" -> "Bond, H. James"
+
+                # CamelCase split
+                # Avoid splitting DeXxxx, McXxxx, MacXxxx, O'Xxxx
+                # Use negative lookbehind?
+                # (?<!\bDe)(?<!\bMc)(?<!\bMac)(?<!\bO')(?<=[a-z])(?=[A-Z])
+                # But "De" might be start of string.
+                # Let's try a simpler approach: Split, then fix if it was De/Mc/Mac.
+
+                trainer = _LOWER_UPPER_RE.sub(' ', trainer)
+
+                # Fix De Lauro -> DeLauro, Mc Cormack -> McCormack, etc.
+                trainer = _NAME_PREFIX_RE.sub(r'\1\2', trainer)
+
+                # Space after period if followed by uppercase
+                trainer = _PERIOD_UPPER_RE.sub('. ', trainer)
+
+                trainer_map[pgm] = trainer
+    return trainer_map
+
+
+def extract_jockey_and_horse(text: str) -> tuple[str, str] | tuple[None, None]:
+    """
+    Extracts Horse Name and Jockey from a string like "HorseName(Jockey)".
+    Handles nested parens and multiple paren groups by finding the last balanced group.
+
+    Returns:
+        tuple: (HorseName, Jockey) or (None, None)
+    """
+    if not text.endswith(')'):
+        return None, None
+
+    # Find the matching opening parenthesis for the last closing parenthesis
+    balance = 0
+    open_idx = -1
+    for i in range(len(text) - 1, -1, -1):
+        char = text[i]
+        if char == ')':
+            balance += 1
+        elif char == '(':
+            balance -= 1
+            if balance == 0:
+                open_idx = i
+                break
+
+    if open_idx != -1:
+        jockey = text[open_idx+1:-1].strip()
+        horse = text[:open_idx].strip()
+
+        # Format jockey name: Ensure space after comma if missing
+        if ',' in jockey and ', ' not in jockey:
+            jockey = jockey.replace(',', ', ')
+
+        # Handle CamelCase in jockey name (e.g. RodriguezCastro -> Rodriguez Castro)
+        jockey = _LOWER_UPPER_RE.sub(' ', jockey)
+
+        # Ensure space before '(' if missing
+        if '(' in jockey and ' (' not in jockey:
+            jockey = jockey.replace('(', ' (')
+
+        return horse, jockey
+
+    return None, None
+
+
+def parse_horse_row(line: str) -> dict[str, str] | None:
+    """
+    Parses a single line to extract horse data (PGM and Jockey).
+
+    Args:
+        line: Text line to parse
+
+    Returns:
+        dict: {"pgm": str, "jockey": str} or None if not a valid horse row
+    """
+    # Cheap pre-filter: a horse row always has Horse(Last,First), so skip anything without
+    # parens and a comma before running the regex
+    if '(' not in line or ')' not in line or ',' not in line:
+        return None
+
+    return _horse_row_from_match(_HORSE_RE.match(line))
+
+
+def _horse_row_from_match(match: re.Match[str] | None) -> dict[str, str] | None:
+    """
+    Builds a horse row from a _HORSE_RE match.
+    Last Raced tokens (3Dec22, 4AQU5, ---) are skipped by the pattern rather than
+    mistaken for the PGM.
+
+    Returns:
+        dict: {"pgm": str, "jockey": str} or None if the match is missing or has no valid jockey
+    """
+    if not match:
+        return None
+
+    horse, jockey = extract_jockey_and_horse(match.group(2))
+    if horse and jockey and ',' in jockey:
+        return {"pgm": match.group(1), "jockey": jockey}
+
+    return None
+
+
+def _date_separator(match: re.Match[str]) -> str:
+    """Replacement for _DATE_NORM: ", " for a comma, " " for a month/day boundary."""
+    return ', ' if match.group() else ' '
+
+
+@lru_cache(maxsize=128)
+def format_date(date_str: str) -> str:
+    """
+    Formats date string from PDF format to readable format.
+    Handles dates with or without spaces (e.g., "January 1, 2025" or "January1,2023").
+
+    Args:
+        date_str: Date string from PDF (e.g., "January 1, 2025" or "January1,2023")
+
+    Returns:
+        str: Formatted date string or original if parsing fails
+    """
+    # Normalize date string by adding spaces if missing
+    # Pattern: "January1,2023" -> "January 1, 2023"
+    # Add space between month and day, and after the comma
+    return _DATE_NORM.sub(_date_separator, date_str)
+
+
+def parse_page(text: str) -> list[RaceRow]:
+    """
+    Parses one page of chart text into race rows.
+
+    Args:
+        text: Extracted page text
+
+    Returns:
+        list: RaceRow per horse in finish order, or an empty list if the page has no race header
+    """
+    # Parse header information
+    track, date_str, race_num = parse_header(text)
+    if not track or date_str is None or race_num is None:
+        return []
+
+    date = format_date(date_str)
+    distance, surface = parse_distance_surface(text)
+    # The footer sits near the end of the page; only scan from "Trainers:" onward
+    footer_start = text.find("Trainers:")
+    trainer_map = parse_trainers_footer(text[footer_start:] if footer_start != -1 else text)
+
+    # Collect horse rows in one scan of the page; finditer yields them top to bottom
+    horse_rows = [
+        row_data
+        for row_data in map(_horse_row_from_match, _HORSE_RE.finditer(text))
+        if row_data
+    ]
+
+    # Process collected rows (assume sorted by finish position)
+    page_races: list[RaceRow] = []
+    for i, row in enumerate(horse_rows):
+        win, place, show = _WPS[i] if i < 3 else _NO_WPS
+        trainer = trainer_map.get(row["pgm"], "")
+
+        page_races.append(
+            RaceRow(date, race_num, surface, distance, row["jockey"], trainer, win, place, show)
+        )
+
+    return page_races
@@ -1,7 +1,18 @@
+import csv
+import os
+import tempfile
 import unittest
 
-from extract_races import (
+from extract_races import extract_race_rows, save_to_csv
+from parsers import (
+    CSV_FIELDNAMES,
+    RaceRow,
     extract_jockey_and_horse,
+    format_date,
+    parse_distance_surface,
+    parse_header,
+    parse_horse_row,
+    parse_page,
     parse_trainers_footer,
 )
 
@@ -29,6 +40,73 @@ class TestRaceExtraction(unittest.TestCase):
         self.assertIsNone(h)
         self.assertIsNone(j)
 
+    def test_parse_header(self):
+        # Compressed spaces
+        self.assertEqual(
+            parse_header(" AQUEDUCT-January1,2023-Race1   \n"),
+            ("AQUEDUCT", "January1,2023", "1"),
+        )
+        self.assertEqual(
+            parse_header("DEL MAR - July 4, 2024 - Race 10"),
+            ("DEL MAR", "July 4, 2024", "10"),
+        )
+
+        # Headerless continuation page padded with layout whitespace
+        text = ("FOOTNOTE TEXT" + " " * 80 + "\n") * 60
+        self.assertEqual(parse_header(text), (None, None, None))
+
+    def test_parse_distance_surface(self):
+        # Compressed spaces
+        self.assertEqual(
+            parse_distance_surface("Distance:SixFurlongsOnTheDirtCurrentTrackRecord:(KellyKip)"),
+            ("Six Furlongs", "Dirt"),
+        )
+        self.assertEqual(
+            parse_distance_surface("Distance:OneMileOnTheAllWeather"),
+            ("One Mile", "All Weather"),
+        )
+        self.assertEqual(
+            parse_distance_surface("Distance: One Mile On The Inner Turf"),
+            ("One Mile", "Turf"),
+        )
+        self.assertEqual(parse_distance_surface("Purse:$43,000"), (None, None))
+
+    def test_format_date(self):
+        self.assertEqual(format_date("January1,2023"), "January 1, 2023")
+        self.assertEqual(format_date("December 31, 2024"), "December 31, 2024")
+
+    def test_parse_page(self):
+        text = "\n".join([
+            "AQUEDUCT-January1,2023-Race1",
+            "Distance:SixFurlongsOnTheDirtCurrentTrackRecord:(KellyKip-1:07.54-April10,1999)",
+            "LastRaced Pgm HorseName(Jockey) WgtM/E PP Start 1/4 1/2 Str Fin Odds Comments",
+            "3Dec224AQU5 4 ClashA.J.(Gomez,Oscar) 122 Lf 3 1 11/2 1Head 2.65 inhand2p,edgedclr",
+            "3Dec22 4AQU2 3 Steerage(Davis,Dylan) 122 Lb 2 3 21 241/2 0.85* prompted4-3w",
+            "--- 5 Quackenbush(Huayas,Gherson(Jason)) 115 L 4 5 421/2 14.40 bumpbtw",
+            "20Nov221AQU8 6 SilentRunning(Harkie,Heman) 122 L 5 2 31/2 2.55 chased3-2w",
+            "FractionalTimes:23.67 47.66 1:00.17 1",
+            "Track:Muddy(Sealed,Fast)",
+            "ScratchedHorse(s): Itsalittlebitfunny(Veterinarian)",
+            "Pgm Horse Win Place Show WagerType WinningNumbers Payoff Pool",
+            "4 ClashA.J. 7.30 2.90 2.30 $1.00Exacta 4-3 6.10 86,534",
+            "7 Exacta(Paid,Pool) 4-3 6.10",
+            "  $2.00 1 DailyDouble(4-1,Paid) 12.40",
+            "Trainers: 4-Jones,Eduardo;3-Brown,Bruce;5-Hennig,Mark;",
+            "6-Bond,H.James",
+            "Owners: 4-EduardoE.Jones;3-LouisLazzinnaroLLC",
+        ])
+        date, race, surface, distance = "January 1, 2023", "1", "Dirt", "Six Furlongs"
+        self.assertEqual(parse_page(text), [
+            RaceRow(date, race, surface, distance, "Gomez, Oscar", "Jones, Eduardo", 1, 0, 0),
+            RaceRow(date, race, surface, distance, "Davis, Dylan", "Brown, Bruce", 0, 1, 0),
+            RaceRow(date, race, surface, distance, "Huayas, Gherson (Jason)", "Hennig, Mark",
+                    0, 0, 1),
+            RaceRow(date, race, surface, distance, "Harkie, Heman", "Bond, H. James", 0, 0, 0),
+        ])
+
+        # Continuation page without a race header
+        self.assertEqual(parse_page("Footnotes|ViewGlossaryOfTerms\nCLASHA.J.brokeout"), [])
+
     def test_parse_trainers_footer(self):
         # Multiline
         text = "Trainers: 1 - Jones, Eduardo; 2 - \n Brown, William"
@@ -36,5 +114,96 @@ class TestRaceExtraction(unittest.TestCase):
         self.assertEqual(mapping.get("1"), "Jones, Eduardo")
         self.assertEqual(mapping.get("2"), "Brown, William")
 
+    def test_parse_horse_row(self):
+        # Last Raced date token before PGM
+        row = parse_horse_row("3Dec224AQU5 4 ClashA.J.(Gomez,Oscar) 122 Lf 3 1 11/2 2.65 inhand")
+        self.assertEqual(row, {"pgm": "4", "jockey": "Gomez, Oscar"})
+
+        # First time starter, nested parens
+        row = parse_horse_row("--- 5 Quackenbush(Huayas,Gherson(Jason)) 115 L 4 5 14.40")
+        self.assertEqual(row, {"pgm": "5", "jockey": "Huayas, Gherson (Jason)"})
+
+        # Last Raced split into date and race tokens
+        row = parse_horse_row("3Dec22 4AQU5 4 ClashA.J.(Gomez,Oscar) 122 Lf 3 1 2.65")
+        self.assertEqual(row, {"pgm": "4", "jockey": "Gomez, Oscar"})
+        row = parse_horse_row("12Nov22 3BEL1 10 Horse(Ortiz,Jose) 1.20")
+        self.assertEqual(row, {"pgm": "10", "jockey": "Ortiz, Jose"})
+        row = parse_horse_row("18Dec22 1A Horse(Smith,John) 2.10")
+        self.assertEqual(row, {"pgm": "1A", "jockey": "Smith, John"})
+
+        # First Horse(...) token has no valid jockey; fall back to a later token
+        row = parse_horse_row("--- 5 Weird(A,B)(C) Horse(Smith,John)")
+        self.assertEqual(row, {"pgm": "5", "jockey": "Smith, John"})
+
+        # Payoff / wager lines
+        self.assertIsNone(parse_horse_row("4 ClashA.J. 7.30 2.90 2.30 $1.00Exacta 4-3 6.10"))
+        self.assertIsNone(parse_horse_row("ScratchedHorse(s): Itsalittlebitfunny(Veterinarian)"))
+        self.assertIsNone(parse_horse_row(""))
+
+    def test_save_to_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "out.csv")
+            row = ("2023-01-01", "1", "Dirt", "Six Furlongs", "Gomez, Oscar", "Jones, Eduardo", 1, 0, 0)
+            count = save_to_csv([row], output_path)
+            self.assertEqual(count, 1)
+            with open(output_path) as f:
+                self.assertEqual(len(f.readlines()), 2)
+            self.assertEqual(os.listdir(tmp), ["out.csv"])
+
+    def test_race_row_matches_csv_header(self):
+        self.assertEqual(len(RaceRow._fields), len(CSV_FIELDNAMES))
+
+        # Keyword construction ties each named field to the header column it lands under
+        row = RaceRow(
+            date="2023-01-01",
+            race_num="1",
+            surface="Dirt",
+            distance="Six Furlongs",
+            jockey="Gomez, Oscar",
+            trainer="Jones, Eduardo",
+            win=1,
+            place=0,
+            show=0,
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "out.csv")
+            save_to_csv([row], output_path)
+            with open(output_path, newline='') as f:
+                written = next(csv.DictReader(f))
+
+        self.assertEqual(written, {
+            "Date": "2023-01-01",
+            "Race #": "1",
+            "Surface": "Dirt",
+            "Distance": "Six Furlongs",
+            "Jockey": "Gomez, Oscar",
+            "Trainer": "Jones, Eduardo",
+            "WIN": "1",
+            "PLACE": "0",
+            "SHOW": "0",
+        })
+
+    def test_save_to_csv_failure_keeps_existing_file(self):
+        def failing_rows():
+            yield ("2023-01-01", "1", "Dirt", "Six Furlongs", "Gomez, Oscar", "", 1, 0, 0)
+            raise RuntimeError("worker failed")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "out.csv")
+            with open(output_path, "w") as f:
+                f.write("previous\n")
+
+            # Failure mid-stream
+            with self.assertRaises(RuntimeError):
+                save_to_csv(failing_rows(), output_path)
+
+            # Failure before the PDF is opened (lazy generator)
+            with self.assertRaises(FileNotFoundError):
+                save_to_csv(extract_race_rows(os.path.join(tmp, "missing.pdf")), output_path)
+
+            with open(output_path) as f:
+                self.assertEqual(f.read(), "previous\n")
+            self.assertEqual(os.listdir(tmp), ["out.csv"])
+
 if __name__ == '__main__':
     unittest.main()